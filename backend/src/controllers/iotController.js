@@ -43,6 +43,7 @@ const processSensorData = async (req, res) => {
       humidity: humidity,
       temperature: temperature,
       crop_yield_estimate: cropYieldEstimate || null,
+      device_id: farm._id.toString(),
     };
 
     // Get ML predictions
@@ -151,6 +152,7 @@ const processSensorData = async (req, res) => {
           _id: farm._id,
           farmSize: farm.farmSize,
         },
+        rollingStats: predictions.rollingStats,
       },
     });
   } catch (error) {
@@ -11,19 +11,15 @@ const getMLPredictions = async (sensorData) => {
   try {
     const baseUrl = `${ML_SERVICE_BASE_URL}/api/v1`;
     
-    // Make parallel requests to all prediction endpoints
-    const [soilType, soilPh, cropType, soilQuality] = await Promise.all([
-      axios.post(`${baseUrl}/predict/soil-type`, sensorData),
-      axios.post(`${baseUrl}/predict/soil-ph`, sensorData),
-      axios.post(`${baseUrl}/predict/crop-type`, sensorData),
-      axios.post(`${baseUrl}/predict/soil-quality`, sensorData),
-    ]);
+    // Single request so the reading is recorded once in the rolling statistics
+    const { data } = await axios.post(`${baseUrl}/predict`, sensorData);
 
     return {
-      soilType: soilType.data,
-      soilPh: soilPh.data,
-      cropType: cropType.data,
-      soilQuality: soilQuality.data,
+      soilType: data.soil_type,
+      soilPh: data.soil_ph,
+      cropType: data.crop_type,
+      soilQuality: data.soil_quality,
+      rollingStats: data.rolling_stats,
     };
   } catch (error) {
     console.error('Error calling ML service:', error.message);
@@ -8,11 +8,14 @@ from app.models.schemas import (
     SoilPHPrediction,
     CropTypePrediction,
     SoilQualityPrediction,
+    FullPrediction,
+    RollingStats,
     PlantDetectionRequest,
     PlantDetectionResponse
 )
 from app.services.prediction_service import PredictionService
 from app.services.detection_service import DetectionService
+from app.services.rolling_stats import rolling_stats_store
 
 router = APIRouter()
 
@@ -53,6 +56,24 @@ async def predict_soil_quality(sensor_data: SensorData) -> SoilQualityPrediction
         raise HTTPException(status_code=500, detail=f"Error predicting soil quality: {str(e)}")
 
 
+@router.post("/predict", response_model=FullPrediction)
+async def predict_all(sensor_data: SensorData) -> FullPrediction:
+    """Run all predictions and return rolling statistics for the device."""
+    try:
+        return PredictionService.predict_all(sensor_data)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error making predictions: {str(e)}")
+
+
+@router.get("/stats/{device_id}", response_model=RollingStats)
+async def get_rolling_stats(device_id: str) -> RollingStats:
+    """Get rolling statistics for a device without recording a reading."""
+    stats = rolling_stats_store.get(device_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"No readings recorded for device: {device_id}")
+    return stats
+
+
 @router.post("/detect-plant", response_model=PlantDetectionResponse)
 async def detect_plant(request: PlantDetectionRequest) -> PlantDetectionResponse:
     """Detect plants in an image."""
@@ -71,6 +92,7 @@ async def health_check() -> Dict[str, Any]:
     return {
         "status": "healthy",
         "service": "ML Service",
-        "models_loaded": True
+        "models_loaded": True,
+        "tracked_devices": len(rolling_stats_store)
     }
 
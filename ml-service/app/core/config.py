@@ -31,6 +31,18 @@ class Settings(BaseSettings):
     OBJECT_DETECTION_CONFIG: str = "ssd_mobilenet_v3_large_coco_2020_01_14.pbtxt"
     COCO_LABELS: str = "coco.txt"
     
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_RATE_LIMIT_INTERVAL: float = 60.0  # seconds; 0 disables deduplication
+    
+    # Rolling sensor statistics
+    STATS_WINDOW_SIZE: int = 96  # readings kept per device
+    STATS_MAX_DEVICES: int = 10000
+    STATS_IDLE_TTL: float = 7 * 24 * 3600  # seconds; 0 disables idle eviction
+    STATS_EWMA_ALPHA: float = 0.2
+    STATS_SNAPSHOT_PATH: Optional[Path] = None  # .npz file; unset disables snapshots
+    
     # CORS
     CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:5000"]
     
@@ -0,0 +1,237 @@
+"""Non-blocking, rate-limited structured logging for the ML service."""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import IO, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# Per-request context, captured on the producer side before records are queued
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_rate_limiter: Optional["RateLimitFilter"] = None
+_summary_stop: Optional[threading.Event] = None
+_summary_thread: Optional[threading.Thread] = None
+
+
+class ContextFilter(logging.Filter):
+    """Attach the current request id and a default model name to each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        if not hasattr(record, "model_name"):
+            record.model_name = None
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Suppress repeated messages within a time window.
+
+    Records below ERROR are keyed by logger, level, message template and
+    model name, so the same warning with different arguments counts as a
+    repeat. ERROR and above, and records carrying an exception, are keyed by
+    the rendered message and exception type so distinct failures are kept.
+
+    The first occurrence in each window passes through; repeats are counted
+    and dropped. Counts are reported by ``flush_expired`` once the window
+    closes, or attached as ``record.suppressed`` to the next occurrence if
+    it arrives first. At most ``max_keys`` messages are tracked per window;
+    beyond that, new messages pass through unthrottled.
+    """
+
+    def __init__(self, interval: float = 60.0, max_keys: int = 1024):
+        super().__init__()
+        self.interval = interval
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> (window start, suppressed count)
+        self._seen: Dict[Tuple, Tuple[float, int]] = {}
+
+    @staticmethod
+    def _key(record: logging.LogRecord) -> Tuple:
+        model_name = getattr(record, "model_name", None)
+        # exc_info=True outside an except block yields (None, None, None)
+        has_exc = bool(record.exc_info) and record.exc_info[0] is not None
+        if record.levelno >= logging.ERROR or has_exc:
+            exc_type = record.exc_info[0].__name__ if has_exc else None
+            return (record.name, record.levelno, record.getMessage(), model_name, exc_type)
+        return (record.name, record.levelno, str(record.msg), model_name, None)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Summaries are never deduplicated against each other
+        if self.interval <= 0 or getattr(record, "suppressed", None):
+            return True
+
+        key = self._key(record)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.interval:
+                self._seen[key] = (entry[0], entry[1] + 1)
+                return False
+            if entry is None and len(self._seen) >= self.max_keys:
+                return True
+            self._seen[key] = (now, 0)
+
+        if entry is not None and entry[1]:
+            record.suppressed = entry[1]
+        return True
+
+    def _emit_summaries(self, pending) -> None:
+        for (name, levelno, msg, model_name, _), count in pending:
+            logging.getLogger(name).log(
+                levelno,
+                "Suppressed %d repeats of: %s",
+                count,
+                msg,
+                extra={"model_name": model_name, "request_id": None, "suppressed": count},
+            )
+
+    def flush_expired(self) -> None:
+        """Report and forget every message whose suppression window has closed."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (start, _) in self._seen.items()
+                       if now - start >= self.interval]
+            pending = [(key, self._seen.pop(key)[1]) for key in expired]
+        self._emit_summaries([(key, count) for key, count in pending if count])
+
+    def flush_summaries(self) -> None:
+        """Report every message that still has suppressed repeats."""
+        with self._lock:
+            pending = [(key, count) for key, (_, count) in self._seen.items() if count]
+            self._seen.clear()
+        self._emit_summaries(pending)
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that defers all formatting to the listener thread.
+
+    The stock ``prepare`` renders the message and traceback and copies the
+    record on the calling thread. Here the record is queued as-is, so
+    arguments are rendered later; callers must not mutate objects passed as
+    log arguments after the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Render log records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "model_name": getattr(record, "model_name", None),
+        }
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            payload["suppressed"] = suppressed
+        if record.exc_info and record.exc_info[0] is not None:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def _flush_summaries_periodically(rate_limiter: RateLimitFilter, stop: threading.Event) -> None:
+    while not stop.wait(rate_limiter.interval):
+        rate_limiter.flush_expired()
+
+
+def setup_logging(
+    stream: Optional[IO[str]] = None,
+    rate_limit_interval: Optional[float] = None,
+) -> logging.handlers.QueueListener:
+    """Route root logging through a queue drained by a background writer thread.
+
+    Request handlers pay for record creation, the context and rate-limit
+    filters and a ``queue.put``; message rendering, JSON encoding and the
+    write to ``stream`` (stderr by default) happen on the listener thread.
+    A second daemon thread reports suppressed repeats once per interval.
+    """
+    global _listener, _rate_limiter, _summary_stop, _summary_thread
+    if _listener is not None:
+        return _listener
+
+    if rate_limit_interval is None:
+        rate_limit_interval = settings.LOG_RATE_LIMIT_INTERVAL
+
+    stream_handler = logging.StreamHandler(stream)
+    if settings.LOG_JSON:
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - "
+            "[%(request_id)s] [%(model_name)s] %(message)s"
+        ))
+
+    _rate_limiter = RateLimitFilter(rate_limit_interval)
+    queue_handler = ContextQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(_rate_limiter)
+
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(
+        queue_handler.queue, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+
+    if rate_limit_interval > 0:
+        _summary_stop = threading.Event()
+        _summary_thread = threading.Thread(
+            target=_flush_summaries_periodically,
+            args=(_rate_limiter, _summary_stop),
+            name="log-summary-flusher",
+            daemon=True,
+        )
+        _summary_thread.start()
+
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Emit pending suppression summaries, drain the queue and stop the writer.
+
+    Afterwards the root logger writes synchronously through the listener's
+    handlers so late records are not lost.
+    """
+    global _listener, _rate_limiter, _summary_stop, _summary_thread
+    if _listener is None:
+        return
+
+    if _summary_stop is not None:
+        _summary_stop.set()
+        _summary_thread.join()
+    if _rate_limiter is not None:
+        _rate_limiter.flush_summaries()
+    _listener.stop()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    for handler in _listener.handlers:
+        handler.addFilter(ContextFilter())
+        root.addHandler(handler)
+
+    _listener = None
+    _rate_limiter = None
+    _summary_stop = None
+    _summary_thread = None
@@ -1,18 +1,19 @@
 """FastAPI application main file."""
 import logging
-from fastapi import FastAPI
+import uuid
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.api.routes import router
+from app.core.logging_config import request_id_var, setup_logging, shutdown_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Configure logging before the router import triggers model loading
+setup_logging()
 logger = logging.getLogger(__name__)
 
+from app.api.routes import router  # noqa: E402
+from app.services.rolling_stats import rolling_stats_store  # noqa: E402
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -29,6 +30,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """Bind a request id to the logging context for the duration of a request."""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+@app.on_event("startup")
+async def restore_rolling_stats():
+    """Reload rolling sensor statistics from the last snapshot, if configured."""
+    if settings.STATS_SNAPSHOT_PATH:
+        rolling_stats_store.restore(settings.STATS_SNAPSHOT_PATH)
+
+
+@app.on_event("shutdown")
+async def save_rolling_stats():
+    """Persist rolling sensor statistics, if configured."""
+    if settings.STATS_SNAPSHOT_PATH:
+        try:
+            rolling_stats_store.snapshot(settings.STATS_SNAPSHOT_PATH)
+        except Exception as e:
+            logger.error("Error saving rolling stats snapshot: %s", e)
+
+
+@app.on_event("shutdown")
+async def flush_logs():
+    """Drain queued log records before the process exits."""
+    shutdown_logging()
+
+
 # Include routers
 app.include_router(router, prefix=settings.API_V1_PREFIX)
 
@@ -0,0 +1,87 @@
+"""Pydantic schemas for request/response models."""
+from typing import Dict, Optional, List
+from pydantic import BaseModel, Field
+
+
+class SensorData(BaseModel):
+    """IoT sensor data input."""
+    npk_n: float = Field(..., description="Nitrogen level", ge=0, le=100)
+    npk_p: float = Field(..., description="Phosphorus level", ge=0, le=100)
+    npk_k: float = Field(..., description="Potassium level", ge=0, le=100)
+    soil_moisture: float = Field(..., description="Soil moisture percentage", ge=0, le=100)
+    humidity: float = Field(..., description="Air humidity percentage", ge=0, le=100)
+    temperature: float = Field(..., description="Temperature in Celsius", ge=-20, le=50)
+    crop_yield_estimate: Optional[float] = Field(None, description="Estimated crop yield")
+    device_id: Optional[str] = Field(None, description="Device or farm id used to track rolling statistics")
+
+
+class SoilTypePrediction(BaseModel):
+    """Soil type prediction response."""
+    soil_type: str = Field(..., description="Predicted soil type")
+    confidence: Optional[float] = Field(None, description="Prediction confidence score")
+
+
+class SoilPHPrediction(BaseModel):
+    """Soil pH prediction response."""
+    soil_ph: float = Field(..., description="Predicted soil pH value")
+    ph_category: str = Field(..., description="pH category (acidic/neutral/alkaline)")
+
+
+class CropTypePrediction(BaseModel):
+    """Crop type prediction response."""
+    crop_type: str = Field(..., description="Recommended crop type")
+    confidence: Optional[float] = Field(None, description="Prediction confidence score")
+    image_url: Optional[str] = Field(None, description="Crop image URL")
+
+
+class SoilQualityPrediction(BaseModel):
+    """Soil quality prediction response."""
+    soil_quality_score: float = Field(..., description="Soil quality score (0-100)")
+    quality_category: str = Field(..., description="Quality category (poor/fair/good/excellent)")
+
+
+class FieldStats(BaseModel):
+    """Rolling aggregates of a single sensor field."""
+    count: int = Field(..., description="Readings in the window with a value for this field")
+    mean: float = Field(..., description="Mean over the window")
+    min: float = Field(..., description="Minimum over the window")
+    max: float = Field(..., description="Maximum over the window")
+    ewma: float = Field(..., description="Exponentially weighted moving average over all readings")
+    slope: float = Field(..., description="Least-squares trend per reading over the window")
+
+
+class RollingStats(BaseModel):
+    """Rolling statistics of a device's sensor stream."""
+    device_id: str = Field(..., description="Device or farm id")
+    window_count: int = Field(..., description="Number of readings in the window")
+    total_readings: int = Field(..., description="Number of readings recorded since tracking began")
+    fields: Dict[str, FieldStats] = Field(..., description="Aggregates keyed by sensor field; fields with no values in the window are omitted")
+
+
+class FullPrediction(BaseModel):
+    """Combined prediction response."""
+    soil_type: SoilTypePrediction
+    soil_ph: SoilPHPrediction
+    crop_type: CropTypePrediction
+    soil_quality: SoilQualityPrediction
+    rolling_stats: Optional[RollingStats] = Field(None, description="Rolling statistics when device_id is given")
+
+
+class PlantDetectionRequest(BaseModel):
+    """Plant detection request."""
+    image_base64: Optional[str] = Field(None, description="Base64 encoded image")
+    image_url: Optional[str] = Field(None, description="Image URL")
+
+
+class DetectedPlant(BaseModel):
+    """Detected plant information."""
+    class_name: str = Field(..., description="Detected plant class")
+    confidence: float = Field(..., description="Detection confidence")
+    bbox: List[float] = Field(..., description="Bounding box coordinates [x, y, width, height]")
+
+
+class PlantDetectionResponse(BaseModel):
+    """Plant detection response."""
+    detected_plants: List[DetectedPlant] = Field(..., description="List of detected plants")
+    count: int = Field(..., description="Number of plants detected")
+
@@ -26,7 +26,7 @@ class DetectionService:
             image = Image.open(io.BytesIO(image_data))
             return np.array(image)
         except Exception as e:
-            logger.error(f"Error loading image from base64: {str(e)}")
+            logger.error("Error loading image from base64: %s", e)
             return None
     
     @staticmethod
@@ -38,7 +38,7 @@ class DetectionService:
             image = Image.open(io.BytesIO(image_data))
             return np.array(image)
         except Exception as e:
-            logger.error(f"Error loading image from URL: {str(e)}")
+            logger.error("Error loading image from URL: %s", e)
             return None
     
     @staticmethod
@@ -109,7 +109,7 @@ class DetectionService:
             )
             
         except Exception as e:
-            logger.error(f"Error detecting plants: {str(e)}")
+            logger.error("Error detecting plants: %s", e)
             return PlantDetectionResponse(
                 detected_plants=[],
                 count=0
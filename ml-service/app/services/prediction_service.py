@@ -9,8 +9,10 @@ from app.models.schemas import (
     SoilTypePrediction,
     SoilPHPrediction,
     CropTypePrediction,
-    SoilQualityPrediction
+    SoilQualityPrediction,
+    FullPrediction
 )
+from app.services.rolling_stats import rolling_stats_store
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +43,8 @@ class PredictionService:
                 # Fallback prediction based on sensor data
                 soil_types = ['Loamy', 'Clay', 'Sandy', 'Peaty', 'Saline']
                 predicted_type = 'Loamy'  # Default
-                logger.warning("Soil type model not loaded, using default prediction")
+                confidence = None
+                logger.warning("Model not loaded, using default prediction", extra={"model_name": "soil_type"})
             else:
                 features = PredictionService._prepare_features(sensor_data)
                 prediction = model.predict(features)
@@ -66,7 +69,7 @@ class PredictionService:
                 confidence=confidence
             )
         except Exception as e:
-            logger.error(f"Error predicting soil type: {str(e)}")
+            logger.error("Error predicting soil type: %s", e, extra={"model_name": "soil_type"})
             return SoilTypePrediction(soil_type="Loamy", confidence=None)
     
     @staticmethod
@@ -77,7 +80,7 @@ class PredictionService:
             if model is None:
                 # Fallback: estimate pH from NPK and moisture
                 estimated_ph = 6.5  # Neutral default
-                logger.warning("Soil pH model not loaded, using default prediction")
+                logger.warning("Model not loaded, using default prediction", extra={"model_name": "soil_ph"})
             else:
                 features = PredictionService._prepare_features(sensor_data)
                 prediction = model.predict(features)
@@ -100,7 +103,7 @@ class PredictionService:
                 ph_category=ph_category
             )
         except Exception as e:
-            logger.error(f"Error predicting soil pH: {str(e)}")
+            logger.error("Error predicting soil pH: %s", e, extra={"model_name": "soil_ph"})
             return SoilPHPrediction(soil_ph=6.5, ph_category="neutral")
     
     @staticmethod
@@ -112,7 +115,8 @@ class PredictionService:
                 # Fallback: recommend based on soil conditions
                 crop_types = ['Maize', 'Beans', 'Potato', 'Tomato', 'Rice', 'Wheat']
                 recommended_crop = 'Maize'  # Default
-                logger.warning("Crop type model not loaded, using default prediction")
+                confidence = None
+                logger.warning("Model not loaded, using default prediction", extra={"model_name": "crop_type"})
             else:
                 features = PredictionService._prepare_features(sensor_data)
                 prediction = model.predict(features)
@@ -140,7 +144,7 @@ class PredictionService:
                 image_url=image_url
             )
         except Exception as e:
-            logger.error(f"Error predicting crop type: {str(e)}")
+            logger.error("Error predicting crop type: %s", e, extra={"model_name": "crop_type"})
             return CropTypePrediction(
                 crop_type="Maize",
                 confidence=None,
@@ -156,7 +160,7 @@ class PredictionService:
                 # Fallback: calculate quality based on NPK levels and moisture
                 npk_avg = (sensor_data.npk_n + sensor_data.npk_p + sensor_data.npk_k) / 3
                 quality_score = min(100, max(0, (npk_avg / 100) * 70 + (sensor_data.soil_moisture / 100) * 30))
-                logger.warning("Soil quality model not loaded, using calculated score")
+                logger.warning("Model not loaded, using calculated score", extra={"model_name": "soil_quality"})
             else:
                 features = PredictionService._prepare_features(sensor_data)
                 prediction = model.predict(features)
@@ -184,9 +188,26 @@ class PredictionService:
                 quality_category=quality_category
             )
         except Exception as e:
-            logger.error(f"Error predicting soil quality: {str(e)}")
+            logger.error("Error predicting soil quality: %s", e, extra={"model_name": "soil_quality"})
             return SoilQualityPrediction(
                 soil_quality_score=50.0,
                 quality_category="fair"
             )
-
+    
+    @staticmethod
+    def predict_all(sensor_data: SensorData) -> FullPrediction:
+        """Run all predictions and record the reading in the rolling statistics store."""
+        rolling_stats = None
+        if sensor_data.device_id:
+            try:
+                rolling_stats = rolling_stats_store.update(sensor_data.device_id, sensor_data)
+            except Exception as e:
+                logger.error("Error updating rolling stats for %s: %s", sensor_data.device_id, e)
+        
+        return FullPrediction(
+            soil_type=PredictionService.predict_soil_type(sensor_data),
+            soil_ph=PredictionService.predict_soil_ph(sensor_data),
+            crop_type=PredictionService.predict_crop_type(sensor_data),
+            soil_quality=PredictionService.predict_soil_quality(sensor_data),
+            rolling_stats=rolling_stats
+        )
@@ -0,0 +1,348 @@
+"""Incremental per-device rolling statistics for sensor streams."""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.schemas import FieldStats, RollingStats, SensorData
+
+logger = logging.getLogger(__name__)
+
+# Column order of the ring buffers, matching PredictionService._prepare_features
+SENSOR_FIELDS = (
+    "npk_n",
+    "npk_p",
+    "npk_k",
+    "soil_moisture",
+    "humidity",
+    "temperature",
+    "crop_yield_estimate",
+)
+
+_SNAPSHOT_VERSION = 3
+
+
+class _RollingWindow:
+    """Fixed-size ring buffer of readings with running aggregates.
+
+    Missing and non-finite values are stored as NaN and excluded from every
+    aggregate, so each field keeps its own count. Per field, the window keeps running sums
+    of y, i, i*i and i*y over present readings, where i is the reading's
+    rank from the oldest in the window; these give the mean and
+    least-squares slope in O(1) per reading. Min and max come from monotonic
+    deques of ring slot numbers, stored in fixed-size int16/int32 arrays,
+    which are amortized O(1) per reading. The running sums are rebuilt from the
+    buffer once per full window to bound float drift.
+    """
+
+    __slots__ = (
+        "values", "total", "count", "last_seen",
+        "n", "s_y", "s_i", "s_ii", "s_iy", "ewma",
+        "min_q", "min_head", "min_len", "max_q", "max_head", "max_len",
+    )
+
+    def __init__(self, window: int, n_fields: int):
+        self.values = np.full((window, n_fields), np.nan, dtype=np.float32)
+        self.total = 0  # readings pushed so far; the next one goes to slot total % window
+        self.count = 0  # readings currently in the window
+        self.last_seen = 0.0
+        self.n = np.zeros(n_fields)  # present readings per field
+        self.s_y = np.zeros(n_fields)
+        self.s_i = np.zeros(n_fields)
+        self.s_ii = np.zeros(n_fields)
+        self.s_iy = np.zeros(n_fields)
+        self.ewma = np.full(n_fields, np.nan)
+        index = np.int16 if window <= np.iinfo(np.int16).max else np.int32
+        self.min_q = np.zeros((n_fields, window), dtype=index)
+        self.min_head = np.zeros(n_fields, dtype=index)
+        self.min_len = np.zeros(n_fields, dtype=index)
+        self.max_q = np.zeros((n_fields, window), dtype=index)
+        self.max_head = np.zeros(n_fields, dtype=index)
+        self.max_len = np.zeros(n_fields, dtype=index)
+
+    def push(self, reading: np.ndarray, alpha: float) -> None:
+        """Append a reading, evicting the oldest one when the window is full."""
+        window = len(self.values)
+        with np.errstate(over="ignore"):
+            x = reading.astype(np.float32).astype(np.float64)
+        # Values beyond float32 range overflow to inf; treat them as missing
+        present = np.isfinite(x)
+        x = np.where(present, x, np.nan)
+        x_or_zero = np.where(present, x, 0.0)
+        slot = self.total % window
+        full = self.count == window
+
+        if full:
+            old = self.values[slot].astype(np.float64)
+            old_present = ~np.isnan(old)
+            self.n -= old_present
+            self.s_y -= np.where(old_present, old, 0.0)
+            # Every remaining reading moves one rank closer to the oldest
+            self.s_ii += self.n - 2 * self.s_i
+            self.s_i -= self.n
+            self.s_iy -= self.s_y
+        else:
+            self.count += 1
+
+        if full:
+            self._expire(slot)
+        self.values[slot] = x
+
+        rank = self.count - 1
+        self.n += present
+        self.s_y += x_or_zero
+        self.s_i += rank * present
+        self.s_ii += rank * rank * present
+        self.s_iy += rank * x_or_zero
+
+        new_ewma = present & np.isnan(self.ewma)
+        self.ewma[new_ewma] = x[new_ewma]
+        update = present & ~new_ewma
+        self.ewma[update] += alpha * (x[update] - self.ewma[update])
+
+        values = x.tolist()
+        for f in np.flatnonzero(present).tolist():
+            self._append(self.min_q, self.min_head, self.min_len, f, slot, values[f], True)
+            self._append(self.max_q, self.max_head, self.max_len, f, slot, values[f], False)
+
+        self.total += 1
+        if self.total % window == 0:
+            self._resync()
+
+    def _expire(self, slot: int) -> None:
+        """Drop deque entries for the reading about to be overwritten at ``slot``."""
+        window = len(self.values)
+        for q, head, length in ((self.min_q, self.min_head, self.min_len),
+                                (self.max_q, self.max_head, self.max_len)):
+            # The oldest reading can only sit at the front of each deque
+            stale = (length > 0) & (q[np.arange(len(head)), head] == slot)
+            head[stale] = (head[stale] + 1) % window
+            length[stale] -= 1
+
+    def _append(self, q, head, length, f: int, slot: int, value: float, is_min: bool) -> None:
+        window = len(self.values)
+        h, n = int(head[f]), int(length[f])
+        while n:
+            stored = float(self.values[q[f, (h + n - 1) % window], f])
+            if (stored < value) if is_min else (stored > value):
+                break
+            n -= 1
+        q[f, (h + n) % window] = slot
+        length[f] = n + 1
+
+    def _extreme(self, q, head, length) -> np.ndarray:
+        fields = np.arange(len(head))
+        result = self.values[q[fields, head], fields].astype(np.float64)
+        result[length == 0] = np.nan
+        return result
+
+    def _resync(self) -> None:
+        window = len(self.values)
+        ordered = self.values[(np.arange(self.count) + self.total - self.count) % window]
+        ordered = ordered.astype(np.float64)
+        present = ~np.isnan(ordered)
+        ranks = np.arange(self.count, dtype=np.float64)[:, None] * present
+        x_or_zero = np.where(present, ordered, 0.0)
+        self.n = present.sum(axis=0).astype(np.float64)
+        self.s_y = x_or_zero.sum(axis=0)
+        self.s_i = ranks.sum(axis=0)
+        self.s_ii = (ranks * ranks).sum(axis=0)
+        self.s_iy = (ranks * x_or_zero).sum(axis=0)
+
+    def slope(self) -> np.ndarray:
+        """Least-squares slope of each field per reading over the window."""
+        denominator = self.n * self.s_ii - self.s_i * self.s_i
+        numerator = self.n * self.s_iy - self.s_i * self.s_y
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = numerator / denominator
+        return np.where((self.n >= 2) & (denominator > 0), slope, 0.0)
+
+    def to_stats(self, device_id: str) -> RollingStats:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = self.s_y / self.n
+        minimum = self._extreme(self.min_q, self.min_head, self.min_len)
+        maximum = self._extreme(self.max_q, self.max_head, self.max_len)
+        slope = self.slope()
+        return RollingStats(
+            device_id=device_id,
+            window_count=self.count,
+            total_readings=self.total,
+            fields={
+                name: FieldStats(
+                    count=int(self.n[i]),
+                    mean=round(float(mean[i]), 4),
+                    min=round(float(minimum[i]), 4),
+                    max=round(float(maximum[i]), 4),
+                    ewma=round(float(self.ewma[i]), 4),
+                    slope=round(float(slope[i]), 6),
+                )
+                for i, name in enumerate(SENSOR_FIELDS)
+                if self.n[i] > 0
+            },
+        )
+
+
+class RollingStatsStore:
+    """In-memory rolling statistics keyed by device or farm id.
+
+    Memory is bounded by ``window_size`` readings per key and ``max_devices``
+    keys. Keys are kept in least-recently-updated order; the oldest are
+    evicted when the store is full or they have been idle for longer than
+    ``idle_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        window_size: int = settings.STATS_WINDOW_SIZE,
+        max_devices: int = settings.STATS_MAX_DEVICES,
+        idle_ttl: float = settings.STATS_IDLE_TTL,
+        ewma_alpha: float = settings.STATS_EWMA_ALPHA,
+    ):
+        self.window_size = window_size
+        self.max_devices = max_devices
+        self.idle_ttl = idle_ttl
+        self.ewma_alpha = ewma_alpha
+        self._windows: "OrderedDict[str, _RollingWindow]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    @staticmethod
+    def _to_vector(sensor_data: SensorData) -> np.ndarray:
+        # Missing optional fields become NaN and are left out of the aggregates
+        return np.array([getattr(sensor_data, name) for name in SENSOR_FIELDS], dtype=np.float64)
+
+    def _new_window(self) -> _RollingWindow:
+        return _RollingWindow(self.window_size, len(SENSOR_FIELDS))
+
+    def _evict(self, now: float) -> None:
+        while self._windows:
+            key, window = next(iter(self._windows.items()))
+            idle = self.idle_ttl > 0 and now - window.last_seen > self.idle_ttl
+            if len(self._windows) <= self.max_devices and not idle:
+                break
+            del self._windows[key]
+
+    def update(self, device_id: str, sensor_data: SensorData) -> RollingStats:
+        """Record a reading for a device and return its updated statistics."""
+        reading = self._to_vector(sensor_data)
+        now = time.time()
+        with self._lock:
+            window = self._windows.get(device_id)
+            if window is None:
+                window = self._new_window()
+                self._windows[device_id] = window
+            else:
+                self._windows.move_to_end(device_id)
+            window.push(reading, self.ewma_alpha)
+            window.last_seen = now
+            self._evict(now)
+            return window.to_stats(device_id)
+
+    def get(self, device_id: str) -> Optional[RollingStats]:
+        """Return current statistics for a device without recording a reading."""
+        with self._lock:
+            window = self._windows.get(device_id)
+            if window is None:
+                return None
+            return window.to_stats(device_id)
+
+    def snapshot(self, path: Path) -> None:
+        """Write all windows to a compressed ``.npz`` file, replacing ``path`` atomically.
+
+        Each window attribute is stacked across devices into one array; device
+        ids and settings go in a JSON header stored as a byte array.
+        """
+        with self._lock:
+            keys = list(self._windows)
+            windows = list(self._windows.values())
+            arrays = {
+                slot: np.stack([np.asarray(getattr(w, slot)) for w in windows])
+                for slot in _RollingWindow.__slots__
+            } if windows else {}
+
+        header = {
+            "version": _SNAPSHOT_VERSION,
+            "window_size": self.window_size,
+            "fields": list(SENSOR_FIELDS),
+            "keys": keys,
+        }
+        arrays["header"] = np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8)
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+        logger.info("Saved rolling stats for %d devices to %s", len(keys), path)
+
+    def restore(self, path: Path) -> int:
+        """Load windows from a snapshot written by ``snapshot``.
+
+        Returns the number of devices restored. Malformed or mismatched
+        snapshots are ignored.
+        """
+        path = Path(path)
+        if not path.exists():
+            logger.info("No rolling stats snapshot at %s", path)
+            return 0
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                header = json.loads(data["header"].tobytes().decode("utf-8"))
+                if (header.get("version") != _SNAPSHOT_VERSION
+                        or header.get("window_size") != self.window_size
+                        or tuple(header.get("fields", ())) != SENSOR_FIELDS):
+                    logger.warning(
+                        "Rolling stats snapshot %s does not match current settings, ignoring", path
+                    )
+                    return 0
+                keys = [str(key) for key in header["keys"]]
+                arrays = {slot: data[slot] for slot in _RollingWindow.__slots__ if keys}
+            windows = self._windows_from_arrays(keys, arrays)
+        except Exception as e:
+            logger.error("Error loading rolling stats snapshot %s: %s", path, e)
+            return 0
+
+        with self._lock:
+            self._windows = windows
+            self._evict(time.time())
+            restored = len(self._windows)
+        logger.info("Restored rolling stats for %d devices from %s", restored, path)
+        return restored
+
+    def _windows_from_arrays(self, keys, arrays) -> "OrderedDict[str, _RollingWindow]":
+        windows: "OrderedDict[str, _RollingWindow]" = OrderedDict()
+        if not keys:
+            return windows
+
+        template = self._new_window()
+        for slot in _RollingWindow.__slots__:
+            expected = (len(keys),) + np.shape(getattr(template, slot))
+            if arrays[slot].shape != expected:
+                raise ValueError(f"{slot} has shape {arrays[slot].shape}, expected {expected}")
+
+        for i, key in enumerate(keys):
+            window = self._new_window()
+            for slot in _RollingWindow.__slots__:
+                value = arrays[slot][i]
+                current = getattr(window, slot)
+                if isinstance(current, np.ndarray):
+                    setattr(window, slot, value.astype(current.dtype))
+                else:
+                    setattr(window, slot, type(current)(value))
+            windows[key] = window
+        return windows
+
+
+# Global rolling statistics store
+rolling_stats_store = RollingStatsStore()
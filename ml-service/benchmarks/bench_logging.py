@@ -0,0 +1,129 @@
+"""Benchmark request-path logging overhead before and after the queue-based setup.
+
+Run from the ml-service directory:
+
+    python -m benchmarks.bench_logging
+
+"Before" mirrors the original configuration: ``logging.basicConfig`` writing
+synchronously to the stream and f-string messages built on every call.
+"After" uses ``app.core.logging_config.setup_logging``: lazy ``%`` arguments,
+rate-limited repeats and a background writer thread.
+
+Timings are wall-clock microseconds per call on the logging thread:
+
+- "repeated" rows log one fixed message, so after the change nearly every
+  record is dropped by the rate limiter.
+- "unique error" and "rate limit off" rows are records that are written.
+  With a fast sink the listener thread still competes for the GIL, so these
+  are not expected to get cheaper.
+- "slow sink" rows write to a stream whose ``write`` blocks, as stderr does
+  under a slow log collector. This is where the queue removes the wait.
+"""
+import itertools
+import logging
+import tempfile
+import time
+
+from app.core.logging_config import setup_logging, shutdown_logging
+
+ITERATIONS = 50_000
+SLOW_ITERATIONS = 2_000
+SLOW_WRITE_SECONDS = 0.0001
+ERROR = ValueError("model input has wrong shape")
+FEATURES = [12.5, 8.0, 20.1, 35.2, 61.0, 24.3, 0.0]
+
+logger = logging.getLogger("bench")
+
+
+class SlowStream:
+    """Stream whose writes block without holding the GIL."""
+
+    def write(self, text: str) -> int:
+        time.sleep(SLOW_WRITE_SECONDS)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def _per_call_us(func, iterations: int = ITERATIONS) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _scenarios(lazy: bool) -> dict:
+    counter = itertools.count()
+    if not lazy:
+        return {
+            "repeated warning": lambda: logger.warning(
+                "Soil type model not loaded, using default prediction"
+            ),
+            "repeated error": lambda: logger.error(f"Error predicting soil type: {str(ERROR)}"),
+            "unique error": lambda: logger.error(
+                f"Error predicting soil type: {str(ValueError(next(counter)))}"
+            ),
+            "filtered debug": lambda: logger.debug(f"Features: {FEATURES}"),
+        }
+    return {
+        "repeated warning": lambda: logger.warning(
+            "Model not loaded, using default prediction", extra={"model_name": "soil_type"}
+        ),
+        "repeated error": lambda: logger.error(
+            "Error predicting soil type: %s", ERROR, extra={"model_name": "soil_type"}
+        ),
+        "unique error": lambda: logger.error(
+            "Error predicting soil type: %s", ValueError(next(counter)),
+            extra={"model_name": "soil_type"},
+        ),
+        "filtered debug": lambda: logger.debug("Features: %s", FEATURES),
+    }
+
+
+def _before(stream, slow_stream) -> dict:
+    root = logging.getLogger()
+    scenarios = _scenarios(lazy=False)
+
+    root.handlers.clear()
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=stream,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    results = {name: _per_call_us(func) for name, func in scenarios.items()}
+    results["repeated error, rate limit off"] = results["repeated error"]
+
+    root.handlers.clear()
+    logging.basicConfig(level=logging.INFO, stream=slow_stream)
+    results["unique error, slow sink"] = _per_call_us(scenarios["unique error"], SLOW_ITERATIONS)
+    root.handlers.clear()
+    return results
+
+
+def _after(stream, rate_limit_interval: float, iterations: int = ITERATIONS) -> dict:
+    setup_logging(stream, rate_limit_interval=rate_limit_interval)
+    results = {
+        name: _per_call_us(func, iterations)
+        for name, func in _scenarios(lazy=True).items()
+    }
+    shutdown_logging()
+    logging.getLogger().handlers.clear()
+    return results
+
+
+def main() -> None:
+    slow_stream = SlowStream()
+    with tempfile.TemporaryFile("w+") as stream:
+        before = _before(stream, slow_stream)
+        after = _after(stream, rate_limit_interval=60.0)
+        after["repeated error, rate limit off"] = _after(stream, 0)["repeated error"]
+    after["unique error, slow sink"] = _after(slow_stream, 60.0, SLOW_ITERATIONS)["unique error"]
+
+    print(f"{'scenario':<34}{'before (us/call)':>18}{'after (us/call)':>18}")
+    for name in before:
+        print(f"{name:<34}{before[name]:>18.2f}{after[name]:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
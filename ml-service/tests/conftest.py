@@ -0,0 +1,6 @@
+"""Shared pytest configuration for the ML service tests."""
+import sys
+from pathlib import Path
+
+# Make the ``app`` package importable when pytest is run from any directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
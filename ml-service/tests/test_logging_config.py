@@ -0,0 +1,190 @@
+"""Tests for the queue-based logging setup."""
+import io
+import json
+import logging
+
+import pytest
+
+from app.core import logging_config
+from app.core.logging_config import (
+    ContextFilter,
+    JsonFormatter,
+    RateLimitFilter,
+    request_id_var,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+def _record(msg, *args, level=logging.WARNING, exc_info=None, **extra):
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, exc_info)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(logging_config.time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def captured_logging():
+    """Run the real setup against an in-memory stream and restore the root logger."""
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    stream = io.StringIO()
+    setup_logging(stream, rate_limit_interval=60.0)
+
+    def lines():
+        shutdown_logging()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield lines
+    shutdown_logging()
+    root.handlers[:] = saved_handlers
+    root.setLevel(saved_level)
+
+
+def test_context_filter_attaches_request_id():
+    token = request_id_var.set("req-1")
+    try:
+        record = _record("hello")
+        ContextFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+
+    assert record.request_id == "req-1"
+    assert record.model_name is None
+
+
+def test_context_filter_keeps_explicit_values():
+    record = _record("hello", request_id=None, model_name="soil_ph")
+    ContextFilter().filter(record)
+
+    assert record.request_id is None
+    assert record.model_name == "soil_ph"
+
+
+def test_rate_limit_suppresses_repeats_within_window(clock):
+    limiter = RateLimitFilter(interval=60.0)
+
+    assert limiter.filter(_record("Model not loaded"))
+    assert not limiter.filter(_record("Model not loaded"))
+    assert not limiter.filter(_record("Model not loaded"))
+
+    clock.now += 61
+    record = _record("Model not loaded")
+    assert limiter.filter(record)
+    assert record.suppressed == 2
+
+
+def test_rate_limit_warnings_keyed_by_template(clock):
+    limiter = RateLimitFilter(interval=60.0)
+
+    assert limiter.filter(_record("Features: %s", 1))
+    assert not limiter.filter(_record("Features: %s", 2))
+
+
+def test_rate_limit_keeps_distinct_errors(clock):
+    limiter = RateLimitFilter(interval=60.0)
+    template = "Error predicting soil type: %s"
+
+    assert limiter.filter(_record(template, ValueError("a"), level=logging.ERROR))
+    assert limiter.filter(_record(template, KeyError("different"), level=logging.ERROR))
+    assert not limiter.filter(_record(template, ValueError("a"), level=logging.ERROR))
+
+
+def test_exc_info_without_active_exception(captured_logging):
+    logger = logging.getLogger("no-exc-test")
+
+    logger.error("Error predicting soil type: %s", "x", exc_info=True)
+    logger.warning("Model not loaded", exc_info=True)
+    error, warning = captured_logging()
+
+    assert error["message"] == "Error predicting soil type: x"
+    assert warning["message"] == "Model not loaded"
+    assert "exc_info" not in error and "exc_info" not in warning
+
+
+def test_rate_limit_disabled_with_zero_interval():
+    limiter = RateLimitFilter(interval=0)
+
+    assert all(limiter.filter(_record("same")) for _ in range(3))
+
+
+def test_rate_limit_stops_tracking_beyond_max_keys(clock):
+    limiter = RateLimitFilter(interval=60.0, max_keys=2)
+    for i in range(3):
+        limiter.filter(_record(f"message {i}"))
+
+    # Untracked message is never throttled
+    assert limiter.filter(_record("message 2"))
+
+
+def test_flush_expired_reports_closed_windows(clock, captured_logging):
+    limiter = logging_config._rate_limiter
+    logger = logging.getLogger("flush-test")
+
+    token = request_id_var.set("req-1")
+    try:
+        for _ in range(4):
+            logger.warning("Model not loaded", extra={"model_name": "soil_type"})
+    finally:
+        request_id_var.reset(token)
+
+    limiter.flush_expired()  # window still open, nothing reported
+    clock.now += 61
+    limiter.flush_expired()
+    lines = captured_logging()
+
+    assert [line["message"] for line in lines] == [
+        "Model not loaded",
+        "Suppressed 3 repeats of: Model not loaded",
+    ]
+    summary = lines[1]
+    assert summary["suppressed"] == 3
+    assert summary["model_name"] == "soil_type"
+    assert summary["request_id"] is None
+
+
+def test_queued_records_render_as_json(captured_logging):
+    logger = logging.getLogger("json-test")
+    token = request_id_var.set("req-42")
+    try:
+        logger.info("Predicted %s", "Loamy", extra={"model_name": "soil_type"})
+        try:
+            raise ValueError("bad input")
+        except ValueError:
+            logger.exception("Error predicting soil type: %s", "bad input")
+    finally:
+        request_id_var.reset(token)
+
+    info, error = captured_logging()
+
+    assert set(info) == {"timestamp", "level", "logger", "message", "request_id", "model_name"}
+    assert info["message"] == "Predicted Loamy"
+    assert info["request_id"] == "req-42"
+    assert info["model_name"] == "soil_type"
+    assert error["level"] == "ERROR"
+    assert error["message"] == "Error predicting soil type: bad input"
+    assert "ValueError: bad input" in error["exc_info"]
+
+
+def test_json_formatter_includes_suppressed_count():
+    record = _record("Suppressed %d repeats of: %s", 3, "x", suppressed=3,
+                     request_id=None, model_name=None)
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["suppressed"] == 3
+    assert payload["message"] == "Suppressed 3 repeats of: x"
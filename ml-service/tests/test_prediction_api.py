@@ -0,0 +1,118 @@
+"""Tests for the combined prediction endpoint and rolling statistics routes."""
+import importlib
+import sys
+import types
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.services.rolling_stats import RollingStatsStore
+
+READING = {
+    "npk_n": 40.0,
+    "npk_p": 30.0,
+    "npk_k": 20.0,
+    "soil_moisture": 35.0,
+    "humidity": 60.0,
+    "temperature": 24.0,
+}
+
+
+class _NoModels:
+    """Stand-in for ModelLoader with every model missing, so fallbacks are used."""
+
+    def get_model(self, model_name):
+        return None
+
+    def get_object_detection_paths(self):
+        return None, None
+
+    def get_coco_labels(self):
+        return None
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Import the services and routes against a model loader with no models.
+
+    The real loader imports TensorFlow and reads model files at import time.
+    """
+    fake_loader = types.ModuleType("app.core.model_loader")
+    fake_loader.model_loader = _NoModels()
+    monkeypatch.setitem(sys.modules, "app.core.model_loader", fake_loader)
+    for name in ("app.services.prediction_service",
+                 "app.services.detection_service",
+                 "app.api.routes"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    prediction_service = importlib.import_module("app.services.prediction_service")
+    routes = importlib.import_module("app.api.routes")
+    store = RollingStatsStore(window_size=8, max_devices=10, idle_ttl=0)
+    monkeypatch.setattr(prediction_service, "rolling_stats_store", store)
+    monkeypatch.setattr(routes, "rolling_stats_store", store)
+
+    app = FastAPI()
+    app.include_router(routes.router, prefix=settings.API_V1_PREFIX)
+    return types.SimpleNamespace(
+        client=TestClient(app),
+        service=prediction_service.PredictionService,
+        schemas=importlib.import_module("app.models.schemas"),
+        store=store,
+    )
+
+
+def test_predict_all_records_each_reading_once(api):
+    for expected in (1, 2):
+        response = api.client.post("/api/v1/predict", json={**READING, "device_id": "farm-1"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["rolling_stats"]["total_readings"] == expected
+        assert api.store.get("farm-1").total_readings == expected
+
+    assert body["soil_type"]["soil_type"] == "Loamy"
+    assert body["rolling_stats"]["fields"]["npk_n"]["mean"] == 40.0
+
+
+def test_predict_all_without_device_id(api):
+    response = api.client.post("/api/v1/predict", json=READING)
+
+    assert response.status_code == 200
+    assert response.json()["rolling_stats"] is None
+    assert len(api.store) == 0
+
+
+def test_predict_all_survives_stats_failure(api, monkeypatch):
+    def fail(device_id, sensor_data):
+        raise RuntimeError("store unavailable")
+
+    monkeypatch.setattr(api.store, "update", fail)
+    result = api.service.predict_all(api.schemas.SensorData(**READING, device_id="farm-1"))
+
+    assert result.rolling_stats is None
+    assert result.soil_ph.ph_category == "neutral"
+
+
+def test_predict_all_with_overflowing_value(api):
+    reading = {**READING, "device_id": "farm-1", "crop_yield_estimate": 1e39}
+    response = api.client.post("/api/v1/predict", json=reading)
+
+    assert response.status_code == 200
+    assert "crop_yield_estimate" not in response.json()["rolling_stats"]["fields"]
+
+
+def test_get_rolling_stats(api):
+    api.client.post("/api/v1/predict", json={**READING, "device_id": "farm-1"})
+    response = api.client.get("/api/v1/stats/farm-1")
+
+    assert response.status_code == 200
+    assert response.json()["total_readings"] == 1
+    # Reading stats does not record a reading
+    assert api.store.get("farm-1").total_readings == 1
+
+
+def test_get_rolling_stats_unknown_device(api):
+    response = api.client.get("/api/v1/stats/unknown")
+
+    assert response.status_code == 404
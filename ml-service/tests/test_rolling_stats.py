@@ -0,0 +1,210 @@
+"""Tests for the per-device rolling statistics store."""
+import numpy as np
+import pytest
+
+from app.models.schemas import SensorData
+from app.services import rolling_stats
+from app.services.rolling_stats import SENSOR_FIELDS, RollingStatsStore
+
+WINDOW = 8
+
+
+def _reading(values, crop_yield_estimate=None) -> SensorData:
+    fields = dict(zip(SENSOR_FIELDS[:-1], values))
+    return SensorData(**fields, crop_yield_estimate=crop_yield_estimate)
+
+
+def _random_readings(count, seed=0):
+    rng = np.random.default_rng(seed)
+    low = np.array([0, 0, 0, 0, 0, -20])
+    high = np.array([100, 100, 100, 100, 100, 50])
+    # Round through float32 to match what the ring buffer stores
+    return rng.uniform(low, high, (count, 6)).astype(np.float32).astype(np.float64)
+
+
+def _expected(window_values):
+    n = len(window_values)
+    slope = np.polyfit(np.arange(n), window_values, 1)[0] if n > 1 else 0.0
+    return window_values.mean(), window_values.min(), window_values.max(), slope
+
+
+@pytest.fixture
+def store():
+    return RollingStatsStore(window_size=WINDOW, max_devices=3, idle_ttl=0, ewma_alpha=0.5)
+
+
+def test_aggregates_match_brute_force(store):
+    readings = _random_readings(5 * WINDOW + 3)
+
+    for t, values in enumerate(readings):
+        stats = store.update("farm-1", _reading(values))
+        window = readings[max(0, t + 1 - WINDOW):t + 1]
+
+        assert stats.window_count == len(window)
+        assert stats.total_readings == t + 1
+        for i, name in enumerate(SENSOR_FIELDS[:-1]):
+            mean, low, high, slope = _expected(window[:, i])
+            field = stats.fields[name]
+            assert field.count == len(window)
+            assert field.mean == pytest.approx(mean, abs=1e-3)
+            assert field.min == pytest.approx(low, abs=1e-3)
+            assert field.max == pytest.approx(high, abs=1e-3)
+            assert field.slope == pytest.approx(slope, abs=1e-5)
+
+
+def test_ewma(store):
+    for value in (10.0, 20.0, 40.0):
+        stats = store.update("farm-1", _reading([value] * 6))
+
+    # 10 -> 15 -> 27.5 with alpha 0.5
+    assert stats.fields["npk_n"].ewma == pytest.approx(27.5)
+
+
+def test_monotonic_series_extremes_and_slope(store):
+    for t in range(3 * WINDOW):
+        stats = store.update("farm-1", _reading([t % 100] + [50.0] * 5))
+
+    field = stats.fields["npk_n"]
+    assert field.min == 2 * WINDOW
+    assert field.max == 3 * WINDOW - 1
+    assert field.slope == pytest.approx(1.0)
+
+    constant = stats.fields["humidity"]
+    assert (constant.min, constant.max, constant.slope) == (50.0, 50.0, 0.0)
+
+
+def test_missing_field_is_left_out(store):
+    stats = store.update("farm-1", _reading([1.0] * 6))
+
+    assert "crop_yield_estimate" not in stats.fields
+
+
+def test_missing_values_are_excluded_from_aggregates(store):
+    yields = [None, 10.0, None, 20.0, 30.0, None, None, None, None, 40.0, None]
+    for value in yields:
+        stats = store.update("farm-1", _reading([1.0] * 6, crop_yield_estimate=value))
+
+    # Window holds the last 8 readings: 20, 30, 40 at ranks 0, 1, 6
+    field = stats.fields["crop_yield_estimate"]
+    assert field.count == 3
+    assert field.mean == pytest.approx(30.0)
+    assert (field.min, field.max) == (20.0, 40.0)
+    assert field.slope == pytest.approx(np.polyfit([0, 1, 6], [20, 30, 40], 1)[0], abs=1e-5)
+    assert stats.fields["npk_n"].count == WINDOW
+
+
+@pytest.mark.parametrize("bad", [float("inf"), 1e39])
+def test_non_finite_values_are_treated_as_missing(store, bad):
+    store.update("farm-1", _reading([1.0] * 6, crop_yield_estimate=10.0))
+    stats = store.update("farm-1", _reading([1.0] * 6, crop_yield_estimate=bad))
+
+    field = stats.fields["crop_yield_estimate"]
+    assert field.count == 1
+    assert (field.mean, field.min, field.max, field.ewma) == (10.0, 10.0, 10.0, 10.0)
+
+    for value in range(WINDOW):
+        stats = store.update("farm-1", _reading([1.0] * 6, crop_yield_estimate=float(value)))
+
+    # Stats stay finite and serializable after the bad reading leaves the window
+    field = stats.fields["crop_yield_estimate"]
+    assert field.mean == pytest.approx((WINDOW - 1) / 2)
+    assert field.slope == pytest.approx(1.0)
+    stats.model_dump_json()
+
+
+def test_index_buffers_are_compact():
+    window = rolling_stats._RollingWindow(96, len(SENSOR_FIELDS))
+
+    assert window.min_q.dtype == np.int16
+    assert window.min_q.nbytes + window.max_q.nbytes <= window.values.nbytes
+
+
+def test_field_dropped_once_its_values_leave_the_window(store):
+    store.update("farm-1", _reading([1.0] * 6, crop_yield_estimate=5.0))
+    for _ in range(WINDOW):
+        stats = store.update("farm-1", _reading([1.0] * 6))
+
+    assert "crop_yield_estimate" not in stats.fields
+
+
+def test_get_does_not_record(store):
+    store.update("farm-1", _reading([1.0] * 6))
+
+    assert store.get("farm-1").total_readings == 1
+    assert store.get("farm-1").total_readings == 1
+    assert store.get("unknown") is None
+
+
+def test_lru_eviction(store):
+    for key in ("a", "b", "c"):
+        store.update(key, _reading([1.0] * 6))
+    store.update("a", _reading([1.0] * 6))
+    store.update("d", _reading([1.0] * 6))
+
+    assert len(store) == 3
+    assert store.get("b") is None
+    assert store.get("a") is not None
+
+
+def test_idle_eviction(monkeypatch):
+    store = RollingStatsStore(window_size=WINDOW, max_devices=10, idle_ttl=60)
+    clock = iter([1000.0, 1030.0, 1100.0])
+    monkeypatch.setattr(rolling_stats.time, "time", lambda: next(clock))
+
+    store.update("idle", _reading([1.0] * 6))
+    store.update("active", _reading([1.0] * 6))
+    store.update("active", _reading([1.0] * 6))
+
+    assert store.get("idle") is None
+    assert store.get("active") is not None
+
+
+def test_snapshot_round_trip(store, tmp_path):
+    readings = _random_readings(WINDOW + 5)
+    for t, values in enumerate(readings):
+        store.update("a", _reading(values, crop_yield_estimate=None if t % 2 else 12.0))
+    store.update("b", _reading([1.0] * 6))
+    path = tmp_path / "nested" / "stats.npz"
+    store.snapshot(path)
+
+    restored = RollingStatsStore(window_size=WINDOW, max_devices=3, idle_ttl=0, ewma_alpha=0.5)
+    assert restored.restore(path) == 2
+    assert restored.get("a") == store.get("a")
+    assert restored.get("b") == store.get("b")
+
+    # Restored windows keep updating exactly like the originals
+    for values in _random_readings(WINDOW, seed=1):
+        assert restored.update("a", _reading(values)) == store.update("a", _reading(values))
+
+
+def test_snapshot_of_empty_store(store, tmp_path):
+    path = tmp_path / "stats.npz"
+    store.snapshot(path)
+
+    assert RollingStatsStore(window_size=WINDOW).restore(path) == 0
+
+
+def test_restore_ignores_mismatched_window(store, tmp_path):
+    store.update("a", _reading([1.0] * 6))
+    path = tmp_path / "stats.npz"
+    store.snapshot(path)
+
+    other = RollingStatsStore(window_size=WINDOW + 1)
+    assert other.restore(path) == 0
+    assert len(other) == 0
+
+
+def test_restore_rejects_pickled_arrays(store, tmp_path):
+    store.update("a", _reading([1.0] * 6))
+    path = tmp_path / "stats.npz"
+    store.snapshot(path)
+    with np.load(path) as data:
+        arrays = dict(data)
+    arrays["values"] = np.array([object()], dtype=object)
+    np.savez(path, **arrays)
+
+    assert RollingStatsStore(window_size=WINDOW).restore(path) == 0
+
+
+def test_restore_missing_file(tmp_path):
+    assert RollingStatsStore(window_size=WINDOW).restore(tmp_path / "missing.npz") == 0